@@ -0,0 +1,89 @@
+"""
+Persistent SQLite cache for translations and synthesized speech
+Avoids repeat Google round-trips for identical inputs across sessions
+
+Importing this module opens the database and purges expired entries.
+That runs once per process: Python keeps the module in sys.modules, so
+Streamlit reruns of main.py reuse the same connection.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Next to this file so every working directory shares one cache
+CACHE_PATH = Path(__file__).with_name("tts_cache.sqlite")
+
+# Entries older than this are ignored and purged (30 days)
+CACHE_TTL = 30 * 24 * 60 * 60
+
+_lock = threading.Lock()
+_conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+
+with _lock, _conn:
+    _conn.execute(
+        "CREATE TABLE IF NOT EXISTS tts "
+        "(key TEXT PRIMARY KEY, audio BLOB, size REAL, created REAL)"
+    )
+    _conn.execute(
+        "CREATE TABLE IF NOT EXISTS tx "
+        "(key TEXT PRIMARY KEY, src TEXT, translated TEXT, created REAL)"
+    )
+
+
+def make_key(*parts):
+    """Build a cache key from the inputs that determine the output"""
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def get_audio(key):
+    """Return cached (audio, size) for key, or None"""
+    with _lock:
+        row = _conn.execute(
+            "SELECT audio, size FROM tts WHERE key=? AND created>=?",
+            (key, time.time() - CACHE_TTL)
+        ).fetchone()
+    return row
+
+
+def put_audio(key, audio, size):
+    """Store synthesized audio under key"""
+    with _lock, _conn:
+        _conn.execute(
+            "INSERT OR REPLACE INTO tts (key, audio, size, created) VALUES (?, ?, ?, ?)",
+            (key, audio, size, time.time())
+        )
+
+
+def get_translation(key):
+    """Return cached (translated, src) for key, or None"""
+    with _lock:
+        row = _conn.execute(
+            "SELECT translated, src FROM tx WHERE key=? AND created>=?",
+            (key, time.time() - CACHE_TTL)
+        ).fetchone()
+    return row
+
+
+def put_translation(key, translated, src):
+    """Store a translation and its source language under key"""
+    with _lock, _conn:
+        _conn.execute(
+            "INSERT OR REPLACE INTO tx (key, src, translated, created) VALUES (?, ?, ?, ?)",
+            (key, src, translated, time.time())
+        )
+
+
+def purge_expired():
+    """Delete entries older than CACHE_TTL"""
+    cutoff = time.time() - CACHE_TTL
+    with _lock, _conn:
+        _conn.execute("DELETE FROM tts WHERE created<?", (cutoff,))
+        _conn.execute("DELETE FROM tx WHERE created<?", (cutoff,))
+
+
+# Clean up once per process start
+purge_expired()
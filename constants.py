@@ -0,0 +1,87 @@
+"""
+Static page assets, language tables and text patterns
+Kept out of main.py so Streamlit reruns do not rebuild them
+"""
+
+import re
+
+# Sentence boundaries (the separator is captured) and whitespace runs
+SENTENCE_RE = re.compile(r'(?<=[.!?])(\s+)')
+WS_RE = re.compile(r'\s+')
+
+# Custom CSS
+PAGE_CSS = """
+    <style>
+    .main-header {
+        font-size: 3rem;
+        color: #1f77b4;
+        text-align: center;
+        margin-bottom: 1rem;
+    }
+    .sub-header {
+        font-size: 1.2rem;
+        color: #666;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .translation-box {
+        white-space: pre-wrap;
+        padding: 1rem;
+        border: 2px solid #1f77b4;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    .success-box {
+        padding: 1rem;
+        background-color: #d4edda;
+        border: 1px solid #c3e6cb;
+        border-radius: 5px;
+        color: #155724;
+    }
+    </style>
+"""
+
+# Supported translation languages
+TRANSLATION_LANGUAGES = {
+    'auto': 'Auto-detect',
+    'en': 'English',
+    'es': 'Spanish',
+    'fr': 'French',
+    'de': 'German',
+    'it': 'Italian',
+    'pt': 'Portuguese',
+    'ru': 'Russian',
+    'ja': 'Japanese',
+    'ko': 'Korean',
+    'zh-cn': 'Chinese (Simplified)',
+    'zh-tw': 'Chinese (Traditional)',
+    'ar': 'Arabic',
+    'hi': 'Hindi',
+    'nl': 'Dutch',
+    'pl': 'Polish',
+    'tr': 'Turkish',
+    'vi': 'Vietnamese',
+    'th': 'Thai',
+    'id': 'Indonesian',
+    'sv': 'Swedish',
+    'no': 'Norwegian',
+    'da': 'Danish',
+    'fi': 'Finnish',
+    'el': 'Greek',
+    'he': 'Hebrew',
+    'bn': 'Bengali',
+    'ta': 'Tamil',
+    'te': 'Telugu',
+    'ur': 'Urdu',
+    'fa': 'Persian',
+    'ro': 'Romanian',
+    'cs': 'Czech',
+    'hu': 'Hungarian',
+    'uk': 'Ukrainian'
+}
+
+# Source language selectbox options (name -> code)
+SOURCE_OPTIONS = {name: code for code, name in TRANSLATION_LANGUAGES.items()}
+
+# fasttext language labels that gTTS spells differently
+LID_TO_GTTS = {'he': 'iw', 'jv': 'jw'}
@@ -4,16 +4,17 @@ Translate and convert text into natural-sounding speech
 """
 
 import streamlit as st
-from gtts import gTTS
-from gtts.lang import tts_langs
-from deep_translator import GoogleTranslator
-from langdetect import detect, DetectorFactory
-import base64
-from io import BytesIO
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-# Set seed for consistent language detection
-DetectorFactory.seed = 0
+import cache
+from constants import LID_TO_GTTS, PAGE_CSS, SENTENCE_RE, SOURCE_OPTIONS, WS_RE
+
+# Result of a translation; detected is the source language code, or 'auto'
+# when Google detected it without reporting which language it was
+TranslationResult = namedtuple("TranslationResult", ["translated", "detected", "error"])
 
 # Page configuration
 st.set_page_config(
@@ -24,85 +25,14 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
-    <style>
-    .main-header {
-        font-size: 3rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-    .sub-header {
-        font-size: 1.2rem;
-        color: #666;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .translation-box {
-        padding: 1rem;
-        border: 2px solid #1f77b4;
-        border-radius: 5px;
-        margin: 1rem 0;
-    }
-    .success-box {
-        padding: 1rem;
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 5px;
-        color: #155724;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Supported translation languages
-TRANSLATION_LANGUAGES = {
-    'auto': 'Auto-detect',
-    'en': 'English',
-    'es': 'Spanish',
-    'fr': 'French',
-    'de': 'German',
-    'it': 'Italian',
-    'pt': 'Portuguese',
-    'ru': 'Russian',
-    'ja': 'Japanese',
-    'ko': 'Korean',
-    'zh-cn': 'Chinese (Simplified)',
-    'zh-tw': 'Chinese (Traditional)',
-    'ar': 'Arabic',
-    'hi': 'Hindi',
-    'nl': 'Dutch',
-    'pl': 'Polish',
-    'tr': 'Turkish',
-    'vi': 'Vietnamese',
-    'th': 'Thai',
-    'id': 'Indonesian',
-    'sv': 'Swedish',
-    'no': 'Norwegian',
-    'da': 'Danish',
-    'fi': 'Finnish',
-    'el': 'Greek',
-    'he': 'Hebrew',
-    'bn': 'Bengali',
-    'ta': 'Tamil',
-    'te': 'Telugu',
-    'ur': 'Urdu',
-    'fa': 'Persian',
-    'ro': 'Romanian',
-    'cs': 'Czech',
-    'hu': 'Hungarian',
-    'uk': 'Ukrainian'
-}
-
-
-def get_audio_download_link(audio_bytes, filename="audio.mp3"):
-    """Generate download link for audio file"""
-    b64 = base64.b64encode(audio_bytes).decode()
-    return f'<a href="data:audio/mp3;base64,{b64}" download="{filename}">Download Audio File</a>'
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 
+@st.cache_data(ttl=86400)
 def get_supported_languages():
     """Get dictionary of supported languages"""
     try:
+        from gtts.lang import tts_langs
         return tts_langs()
     except:
         # Fallback to common languages
@@ -122,70 +52,231 @@ def get_supported_languages():
         }
 
 
+@st.cache_data
+def _build_language_options(languages):
+    """Map "Name (code)" labels to codes, sorted by language name"""
+    return {f"{name} ({code})": code for code, name in sorted(languages.items(), key=lambda x: x[1])}
+
+
+@st.cache_resource
+def get_lid_model():
+    """Load the quantized FastText language identification model (~1MB), shared across reruns and sessions
+    
+    Returns None when fasttext or the model file is unavailable, so detection
+    degrades to "unknown" instead of breaking the app or retrying the load
+    """
+    try:
+        import fasttext
+        
+        # Bundled next to this file so loading never depends on the working directory
+        return fasttext.load_model(str(Path(__file__).with_name("lid.176.ftz")))
+    except Exception:
+        return None
+
+
+@st.cache_data(max_entries=2048, show_spinner=False)
+def _detect_impl(normalized):
+    """Run the language model on normalized text (failures raise, so they are not cached)"""
+    model = get_lid_model()
+    if model is None:
+        raise RuntimeError("Language identification model is not available")
+    labels, probs = model.predict(normalized, k=1)
+    return labels[0].removeprefix("__label__")
+
+
 def detect_language(text):
     """Detect language of the text"""
+    # Collapsing whitespace also removes newlines, which fasttext rejects
+    norm = WS_RE.sub(' ', text).strip()
+    if not norm:
+        return None
+    
+    # 512 chars is plenty to identify the language; take them from the
+    # middle of long texts to skip headers and boilerplate
+    if len(norm) > 512:
+        mid = len(norm) // 2
+        norm = norm[mid - 256:mid + 256]
     try:
-        lang = detect(text)
-        return lang
+        return _detect_impl(norm)
     except:
         return None
 
 
+def _translator_target(target_lang):
+    """Map gTTS Chinese variant codes to the ones GoogleTranslator expects"""
+    if target_lang == 'zh-cn':
+        return 'zh-CN'
+    elif target_lang == 'zh-tw':
+        return 'zh-TW'
+    return target_lang
+
+
 def translate_text(text, source_lang='auto', target_lang='en'):
     """Translate text from source language to target language"""
+    key = cache.make_key(text, source_lang, target_lang)
+    cached = cache.get_translation(key)
+    if cached:
+        translated, detected = cached
+        return TranslationResult(translated, detected, None)
+
     try:
-        # Detect language if auto
-        detected_lang = None
-        if source_lang == 'auto':
-            detected_lang = detect_language(text)
-            if detected_lang:
-                source_lang = detected_lang
-            else:
-                source_lang = 'en'
-        
         # Don't translate if source and target are the same
         if source_lang == target_lang:
-            return text, source_lang, None
+            return TranslationResult(text, source_lang, None)
         
-        # Handle Chinese variants
-        if target_lang == 'zh-cn':
-            target_lang = 'zh-CN'
-        elif target_lang == 'zh-tw':
-            target_lang = 'zh-TW'
+        from deep_translator import GoogleTranslator
         
-        # Translate using GoogleTranslator
-        translator = GoogleTranslator(source=source_lang, target=target_lang)
+        # GoogleTranslator detects the source itself when given 'auto',
+        # so there is no separate detection call
+        translator = GoogleTranslator(source=source_lang, target=_translator_target(target_lang))
         translated = translator.translate(text)
         
-        return translated, source_lang, None
+        cache.put_translation(key, translated, source_lang)
+        return TranslationResult(translated, source_lang, None)
         
     except Exception as e:
-        return None, None, str(e)
+        return TranslationResult(None, None, str(e))
+
+
+def translate_batch(sentences, source_lang='auto', target_lang='en'):
+    """Translate a list of sentences in one request, reusing cached sentences"""
+    # Don't translate if source and target are the same
+    if source_lang == target_lang:
+        return TranslationResult(list(sentences), source_lang, None)
+    
+    # Sentences are sent, and cached, in whitespace-normalized form; keys
+    # match translate_text() called on the same normalized text
+    normalized = [WS_RE.sub(' ', sentence).strip() for sentence in sentences]
+    keys = [cache.make_key(text, source_lang, target_lang) for text in normalized]
+    cached = [cache.get_translation(key) for key in keys]
+    missing = [i for i, row in enumerate(cached) if not row]
+    
+    if len(missing) == 1:
+        i = missing[0]
+        result = translate_text(normalized[i], source_lang, target_lang)
+        if result.error:
+            return result
+        cached[i] = (result.translated, result.detected)
+    elif missing:
+        try:
+            pending = [normalized[i] for i in missing]
+            
+            from deep_translator import GoogleTranslator
+            translator = GoogleTranslator(source=source_lang, target=_translator_target(target_lang))
+            
+            # One newline-separated request instead of one per sentence
+            # (deep_translator's translate_batch loops over translate())
+            translations = translator.translate("\n".join(pending)).split("\n")
+            if len(translations) != len(pending):
+                translations = translator.translate_batch(pending)
+            
+            for i, translated in zip(missing, translations):
+                cache.put_translation(keys[i], translated, source_lang)
+                cached[i] = (translated, source_lang)
+            
+        except Exception as e:
+            return TranslationResult(None, None, str(e))
+    
+    return TranslationResult([row[0] for row in cached], source_lang, None)
 
 
 def convert_text_to_speech(text, lang='en', slow=False, tld='com'):
     """Convert text to speech and return audio bytes"""
+    key = cache.make_key(text, lang, tld, slow)
+    cached = cache.get_audio(key)
+    if cached:
+        audio_data, file_size = cached
+        return audio_data, file_size, None
+
     try:
+        from gtts import gTTS
+        
         # Create TTS object
         tts = gTTS(text=text, lang=lang, slow=slow, tld=tld)
         
-        # Save to BytesIO instead of file
-        audio_bytes = BytesIO()
-        tts.write_to_fp(audio_bytes)
-        audio_bytes.seek(0)
-        
-        # Get audio data
-        audio_data = audio_bytes.read()
+        # join() sizes the result once from the fragments, with no growing
+        # buffer and no final bytearray -> bytes copy
+        audio_data = b"".join(tts.stream())
         
         # Calculate file size
         file_size = len(audio_data) / 1024  # KB
         
+        cache.put_audio(key, audio_data, file_size)
         return audio_data, file_size, None
         
     except Exception as e:
         return None, None, str(e)
 
 
+def _split_sentences(text):
+    """Split text into sentences, folding fragments with nothing to speak (e.g. '...') into a neighbour
+    
+    Returns the sentences and the original whitespace between each pair of them
+    """
+    parts = SENTENCE_RE.split(text.strip())
+    
+    # parts alternates sentence, separator, sentence, ...
+    sentences, separators, prefix = [], [], ""
+    for i in range(0, len(parts), 2):
+        sentence = parts[i]
+        if any(c.isalnum() for c in sentence):
+            if sentences:
+                separators.append(parts[i - 1])
+            sentences.append(prefix + sentence)
+            prefix = ""
+        elif sentences:
+            sentences[-1] += parts[i - 1] + sentence
+        else:
+            prefix += sentence + (parts[i + 1] if i + 1 < len(parts) else "")
+    
+    if prefix:
+        # Nothing speakable at all; let gTTS report it
+        sentences.append(prefix.strip())
+    return sentences, separators
+
+
+def _group_for_tts(sentences, limit=100):
+    """Pack consecutive sentences into chunks of up to gTTS's 100-char token size"""
+    chunks = []
+    for sentence in sentences:
+        if chunks and len(chunks[-1]) + 1 + len(sentence) <= limit:
+            chunks[-1] += " " + sentence
+        else:
+            chunks.append(sentence)
+    return chunks
+
+
+def text_to_speech_pipeline(text, lang='en', slow=False, tld='com', translate=False, source_lang='auto'):
+    """Translate and convert text sentence by sentence, synthesizing sentences in parallel"""
+    sentences, separators = _split_sentences(text)
+    
+    trans_error = None
+    if translate:
+        result = translate_batch(sentences, source_lang=source_lang, target_lang=lang)
+        trans_error = result.error
+        if not trans_error:
+            sentences = result.translated
+    
+    # Short sentences share one gTTS call instead of each costing a request
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda chunk: convert_text_to_speech(chunk, lang=lang, slow=slow, tld=tld),
+            _group_for_tts(sentences)
+        ))
+    
+    # Rejoin with the original separators to keep the user's paragraph breaks
+    translated_text = sentences[0] + "".join(sep + s for sep, s in zip(separators, sentences[1:]))
+    error = next((r[2] for r in results if r[2]), None)
+    if error:
+        return translated_text, None, None, trans_error, error
+    
+    # MP3 frames can be concatenated directly
+    audio_data = b"".join(r[0] for r in results)
+    file_size = len(audio_data) / 1024  # KB
+    
+    return translated_text, audio_data, file_size, trans_error, None
+
+
 # Header
 st.markdown('<h1 class="main-header">Text-to-Speech with Translation</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Translate and convert your text into natural-sounding speech</p>', unsafe_allow_html=True)
@@ -205,18 +296,16 @@ with st.sidebar:
     
     if enable_translation:
         # Source language
-        source_lang_options = {name: code for code, name in TRANSLATION_LANGUAGES.items()}
-        
         selected_source = st.selectbox(
             "From Language",
-            options=list(source_lang_options.keys()),
+            options=list(SOURCE_OPTIONS.keys()),
             index=0,
             help="Source language (Auto-detect recommended)"
         )
-        source_lang = source_lang_options[selected_source]
+        source_lang = SOURCE_OPTIONS[selected_source]
     
     # Target/Output language selection
-    language_options = {f"{name} ({code})": code for code, name in sorted(languages.items(), key=lambda x: x[1])}
+    language_options = _build_language_options(languages)
     
     selected_lang = st.selectbox(
         "To Language" if enable_translation else "Output Language",
@@ -272,17 +361,24 @@ text_input = st.text_area(
     "Enter your text:",
     height=200,
     placeholder="Type or paste your text here...\n\nExample: Hello! This tool can translate and convert your text into speech in multiple languages.",
-    help="Enter the text you want to convert to speech. Maximum 5000 characters."
+    help="Enter the text you want to convert to speech. Maximum 5000 characters.",
+    # The browser enforces the limit and shows the character count itself,
+    # so typing does not need a rerun to update it
+    max_chars=5000
 )
 
-# Character count
-char_count = len(text_input)
-col1, col2 = st.columns([3, 1])
-with col1:
-    if char_count > 5000:
-        st.error(f"Text too long: {char_count}/5000 characters")
-    else:
-        st.info(f"Characters: {char_count}/5000")
+# Without translation the text is spoken as-is, so show which language it
+# appears to be in and flag a mismatch with the output language
+if not enable_translation and text_input.strip():
+    detected_lang = detect_language(text_input)
+    if detected_lang:
+        detected_lang = LID_TO_GTTS.get(detected_lang, detected_lang)
+        detected_name = languages.get(detected_lang, detected_lang)
+        if detected_lang == lang_code.split('-')[0].lower():
+            st.caption(f"Detected language: {detected_name}")
+        else:
+            st.caption(f"Detected language: {detected_name}. Enable translation to speak it in "
+                       f"{languages.get(lang_code, lang_code)}.")
 
 # Convert button
 col1, col2, col3 = st.columns([1, 1, 2])
@@ -293,67 +389,91 @@ with col2:
         if st.button("Clear Text", use_container_width=True):
             st.rerun()
 
+# Everything that determines the conversion output
+current_inputs = (
+    text_input,
+    lang_code,
+    tld,
+    slow_speech,
+    enable_translation,
+    source_lang if enable_translation else 'auto'
+)
+
+result, result_inputs = None, None
 if convert_button:
     if not text_input or not text_input.strip():
         st.error("Please enter some text to convert!")
-    elif char_count > 5000:
-        st.error("Text is too long. Please reduce to 5000 characters or less.")
+    elif st.session_state.get("last_inputs") == current_inputs:
+        # Same inputs as the last successful conversion
+        result, result_inputs = st.session_state["last_result"], current_inputs
     else:
-        # Step 1: Translation (if enabled)
-        translated_text = text_input
-        detected_lang = None
-        
-        if enable_translation:
-            with st.spinner("Translating text..."):
-                translated_text, detected_lang, trans_error = translate_text(
-                    text_input,
-                    source_lang=source_lang,
-                    target_lang=lang_code
-                )
-                
-                if trans_error:
-                    st.error(f"Translation error: {trans_error}")
-                    st.info("Converting original text to speech instead...")
-                    translated_text = text_input
-                else:
-                    # Show translation result
-                    st.success("Translation successful!")
-                    
-                    # Show translated text
-                    st.markdown("**Translated Text:**")
-                    st.markdown(f'<div class="translation-box">{translated_text}</div>', 
-                              unsafe_allow_html=True)
-        
-        # Step 2: Convert to speech
-        with st.spinner("Converting to speech..."):
-            audio_data, file_size, error = convert_text_to_speech(
-                translated_text, 
-                lang=lang_code, 
+        with st.spinner("Translating and converting to speech..." if enable_translation else "Converting to speech..."):
+            result = text_to_speech_pipeline(
+                text_input,
+                lang=lang_code,
                 slow=slow_speech,
-                tld=tld
+                tld=tld,
+                translate=enable_translation,
+                source_lang=source_lang if enable_translation else 'auto'
             )
+        result_inputs = current_inputs
+        
+        # Only keep fully successful results, so pressing Convert again
+        # retries a failed translation instead of replaying the fallback
+        translated_text, audio_data, file_size, trans_error, error = result
+        if not trans_error and not error:
+            st.session_state["last_result"] = result
+            st.session_state["last_inputs"] = current_inputs
+elif "last_result" in st.session_state:
+    # Re-render the previous conversion after reruns from other widgets
+    result, result_inputs = st.session_state["last_result"], st.session_state["last_inputs"]
+
+if result:
+    translated_text, audio_data, file_size, trans_error, error = result
+    
+    # Describe the result with the settings it was produced with
+    result_lang, result_slow, result_translated = result_inputs[1], result_inputs[3], result_inputs[4]
+    
+    if result_translated:
+        if trans_error:
+            st.error(f"Translation error: {trans_error}")
+            st.info("Converting original text to speech instead...")
+        else:
+            # Show translation result
+            st.success("Translation successful!")
             
-            if error:
-                st.error(f"Error: {error}")
-                st.info("Tip: Make sure you have an internet connection. gTTS requires internet to work.")
-            else:
-                st.success("Conversion successful!")
-                
-                # Display audio player
-                st.audio(audio_data, format='audio/mp3')
-                
-                # File info
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("File Size", f"{file_size:.2f} KB")
-                with col2:
-                    st.metric("Output Language", languages.get(lang_code, lang_code))
-                with col3:
-                    word_count = len(translated_text.split())
-                    st.metric("Approx Duration", f"~{word_count * 0.5:.1f} sec")
-                
-                # Download link
-                st.markdown(get_audio_download_link(audio_data, "audio.mp3"), unsafe_allow_html=True)
+            # Show translated text
+            st.markdown("**Translated Text:**")
+            st.markdown(f'<div class="translation-box">{translated_text}</div>', 
+                      unsafe_allow_html=True)
+    
+    if error:
+        st.error(f"Error: {error}")
+        st.info("Tip: Make sure you have an internet connection. gTTS requires internet to work.")
+    else:
+        st.success("Conversion successful!")
+        
+        # Display audio player
+        st.audio(audio_data, format='audio/mp3')
+        
+        # File info
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("File Size", f"{file_size:.2f} KB")
+        with col2:
+            st.metric("Output Language", languages.get(result_lang, result_lang))
+        with col3:
+            # gTTS speaks roughly 15 characters per second, half that when slow
+            duration = len(translated_text) / (7.5 if result_slow else 15.0)
+            st.metric("Approx Duration", f"~{duration:.1f} sec")
+        
+        # Download button
+        st.download_button(
+            "Download Audio File",
+            data=audio_data,
+            file_name="audio.mp3",
+            mime="audio/mp3"
+        )
 
 # Footer
 st.divider()